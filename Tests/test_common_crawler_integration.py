@@ -10,7 +10,7 @@ import pytest
 
 from common_crawler.csv_manager import CSVManager
 from common_crawler.main import main, BATCH_HEADERS
-from common_crawler.cache import CommonCrawlerCacheManager
+from common_crawler.cache import CommonCrawlerCacheManager, CommonCrawlerIndexCache
 
 class CSVData:
 
@@ -84,6 +84,23 @@ def test_cache_persistence():
 
         # Clean up the test file
 
+def test_index_cache_persistence():
+    """
+    Test that index responses can be stored to and retrieved from the database
+    """
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        content = b'{"url": "http://example.com"}\n{"url": "http://example.com/page2"}'
+        index_cache = CommonCrawlerIndexCache(directory=tmp_dir)
+        assert index_cache.get("CC-MAIN-2020-24", "*.com", 1) is None
+
+        index_cache.put("CC-MAIN-2020-24", "*.com", 1, content)
+
+        # Recreate the cache and check the content is read back from the database
+        index_cache = CommonCrawlerIndexCache(directory=tmp_dir)
+        assert index_cache.get("CC-MAIN-2020-24", "*.com", 1) == content
+        assert index_cache.get("CC-MAIN-2020-24", "*.com", 2) is None
+
 def validate_csvs(local_file_path, repo_file_path):
     # Check that the output file was created, and contains the expected data
 
@@ -132,18 +149,15 @@ def test_main_with_valid_args(mock_upload_file, mocker, temp_dir):
     mock_args.reset_cache = True
 
     # Mock the CommonCrawler to avoid actual web requests
-    common_crawler_results = [
+    # Pages are searched concurrently, so results are keyed by page rather than returned in call order
+    common_crawler_results = {
         # This result, containing the search keyword should be returned in the final output
-        [{
-            'url': 'http://keyword.com'
-        }],
+        1: [b'{"url": "http://keyword.com"}'],
         # This result, because it does not contain the keyword, should not
-        [{
-            'url': 'http://not-in-results.com'
-        }]
-    ]
+        2: [b'{"url": "http://not-in-results.com"}']
+    }
     mock_search_cc_index = mocker.patch('common_crawler.crawler.CommonCrawlerManager.search_common_crawl_index')
-    mock_search_cc_index.side_effect = common_crawler_results
+    mock_search_cc_index.side_effect = lambda url, page: common_crawler_results[page]
 
     # Common crawler sleeps for five seconds during execution -- this avoids that.
     mock_sleep = mocker.patch('time.sleep')
@@ -183,21 +197,15 @@ def test_main_with_valid_args(mock_upload_file, mocker, temp_dir):
     mock_args.keyword = 'police'
     mock_args.pages = 3
     # output_filename, cache_filename, and data_dir are unchanged
-    common_crawler_results_2 = [
+    common_crawler_results_2 = {
         # This result, containing the search keyword should be returned in the final output
-        [{
-            'url': 'http://police.com'
-        }],
+        1: [b'{"url": "http://police.com"}'],
         # This result, because it does not contain the keyword, should not
-        [{
-            'url': 'http://military.com'
-        }],
+        2: [b'{"url": "http://military.com"}'],
         # This result, because it does contain the keyword, should be returned in the final output
-        [{
-            'url': 'http://police.com/page2'
-        }]
-    ]
-    mock_search_cc_index.side_effect = common_crawler_results_2
+        3: [b'{"url": "http://police.com/page2"}']
+    }
+    mock_search_cc_index.side_effect = lambda url, page: common_crawler_results_2[page]
 
 
     # Call main with test arguments
@@ -3,6 +3,7 @@ import json
 from unittest.mock import patch
 from urllib.parse import quote_plus
 
+from common_crawler.cache import CommonCrawlerIndexCache
 from common_crawler.crawler import CommonCrawlerManager
 from common_crawler.argparser import valid_common_crawl_id
 
@@ -15,19 +16,37 @@ mock_search_response = json.dumps({
 })
 
 
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_search_cc_index(mock_get):
     """
     Test that the search_cc_index method returns the expected records
     """
     mock_get.return_value.status_code = 200
     mock_get.return_value.text = mock_search_response
+    mock_get.return_value.content = mock_search_response.encode()
 
     crawler = CommonCrawlerManager()
     result = crawler.search_common_crawl_index("http://example.com")
 
-    assert len(result[0]['records']) == 2  # Assuming the mock response contains 2 records
-    assert result[0]['records'][0]['url'] == "http://example.com"
+    record = json.loads(result[0])
+    assert len(record['records']) == 2  # Assuming the mock response contains 2 records
+    assert record['records'][0]['url'] == "http://example.com"
+
+
+@patch('requests.Session.get')
+def test_search_cc_index_uses_index_cache(mock_get, tmp_path):
+    """
+    Test that a repeated search is read from the index cache instead of requested again
+    """
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.content = mock_search_response.encode()
+
+    crawler = CommonCrawlerManager(index_cache=CommonCrawlerIndexCache(directory=str(tmp_path)))
+    first_result = crawler.search_common_crawl_index("http://example.com")
+    second_result = crawler.search_common_crawl_index("http://example.com")
+
+    assert mock_get.call_count == 1
+    assert first_result == second_result
 
 
 def test_get_urls_with_keyword():
@@ -35,13 +54,69 @@ def test_get_urls_with_keyword():
     Test that the get_urls_with_keyword method returns the expected URLs
     """
     records = [
-        {"url": "http://example.com"},
-        {"url": "http://example.com/page2"},
-        {"url": "http://test.com"}
+        b'{"url": "http://example.com"}',
+        b'{"url": "http://example.com/page2"}',
+        b'{"url": "http://test.com"}',
+        b'{"url": "http://test.com/page2", "filename": "example"}'
     ]
     urls = CommonCrawlerManager.get_urls_with_keyword(records, "example")
-    assert len(urls) == 2
-    assert "http://test.com" not in urls
+    assert urls == ["http://example.com", "http://example.com/page2"]
+
+
+def test_crawl_stops_at_first_failed_page(mocker):
+    """
+    Test that crawl only advances the last page over contiguous pages with results
+    """
+    pages = {
+        1: [b'{"url": "http://example.com"}'],
+        2: None,
+        3: [b'{"url": "http://example.com/page3"}']
+    }
+    mocker.patch.object(
+        CommonCrawlerManager,
+        'search_common_crawl_index',
+        side_effect=lambda url, page: pages[page]
+    )
+
+    result = CommonCrawlerManager().crawl("*.com", "example", start_page=1, num_pages=3)
+
+    assert result.last_page_search == 1
+    assert result.url_results == ["http://example.com"]
+
+
+def test_crawl_does_not_skip_failed_first_page(mocker):
+    """
+    Test that a failed first page is not recorded as searched
+    """
+    pages = {
+        1: None,
+        2: [b'{"url": "http://example.com/page2"}'],
+        3: [b'{"url": "http://example.com/page3"}']
+    }
+    mocker.patch.object(
+        CommonCrawlerManager,
+        'search_common_crawl_index',
+        side_effect=lambda url, page: pages[page]
+    )
+
+    result = CommonCrawlerManager().crawl("*.com", "example", start_page=1, num_pages=3)
+
+    assert result.last_page_search == 0
+    assert result.url_results == []
+
+
+def test_requests_are_rate_limited(mocker):
+    """
+    Test that requests are spaced by the request interval
+    """
+    mocker.patch('time.monotonic', return_value=100.0)
+    mock_sleep = mocker.patch('time.sleep')
+
+    crawler = CommonCrawlerManager(request_interval=1.0)
+    for _ in range(3):
+        crawler.wait_for_request_slot()
+
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [1.0, 2.0]
 
 
 # endregion CommonCrawler
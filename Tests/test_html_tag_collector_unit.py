@@ -0,0 +1,261 @@
+import asyncio
+import json
+import ssl
+
+import httpx
+import pytest
+import requests
+import requests_html
+from selectolax.lexbor import LexborHTMLParser
+
+from html_tag_collector import collector
+from html_tag_collector.collector import (
+    fetch,
+    get_div_text,
+    get_header_tags,
+    get_html,
+    get_response,
+    get_html_title,
+    get_meta_description,
+    is_unreadable_content_type,
+    parse_html,
+    render_js,
+    response_valid,
+)
+from html_tag_collector.DataClassTags import Tags
+
+sample_html = """
+<html>
+<head>
+    <title>  Example   Title </title>
+    <meta name="description" content=" An example   page ">
+</head>
+<body>
+    <h1>Main <i>Header</i></h1>
+    <h2><a href="/link">Linked header</a></h2>
+    <h2>Sub header</h2>
+    <div>First div</div>
+    <div>Second div</div>
+</body>
+</html>
+"""
+
+
+def test_get_html_title():
+    """
+    Test that the HTML title is retrieved with excess whitespace removed
+    """
+    tree = LexborHTMLParser(sample_html)
+    assert get_html_title(tree) == "Example Title"
+    assert get_html_title(LexborHTMLParser("<html></html>")) == ""
+
+
+def test_get_meta_description():
+    """
+    Test that the meta description is retrieved, or empty if it is missing
+    """
+    tree = LexborHTMLParser(sample_html)
+    assert get_meta_description(tree) == "An example page"
+    assert get_meta_description(LexborHTMLParser('<meta name="description">')) == ""
+
+
+def test_get_header_tags():
+    """
+    Test that header tags are retrieved, dropping headers that contain links
+    """
+    tags = get_header_tags(Tags(), LexborHTMLParser(sample_html))
+    assert json.loads(tags.h1) == ["Main Header"]
+    assert json.loads(tags.h2) == ["Sub header"]
+    assert json.loads(tags.h3) == []
+
+
+def test_get_div_text():
+    """
+    Test that the div text is retrieved
+    """
+    tree = LexborHTMLParser(sample_html)
+    assert get_div_text(tree) == "First div Second div"
+
+
+def test_get_div_text_word_limit():
+    """
+    Test that div text stops being added once the 500 word limit would be exceeded
+    """
+    words = " ".join(["word"] * 300)
+    tree = LexborHTMLParser(f"<div>{words}</div><div>{words}</div>")
+    assert get_div_text(tree) == words
+
+
+def test_get_div_text_word_limit_indented():
+    """
+    Test that the indentation and line breaks of div text are not counted as words
+    """
+    words = "\n".join(["    word"] * 200)
+    tree = LexborHTMLParser(f"<div>\n{words}\n</div><div>\n{words}\n</div>")
+    assert len(get_div_text(tree).split()) == 400
+
+
+def make_response(status_code, content):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    return response
+
+
+def test_is_unreadable_content_type():
+    """
+    Test that content types which cannot be parsed for HTML tags are detected
+    """
+    assert is_unreadable_content_type("application/pdf")
+    assert is_unreadable_content_type("application/octet-stream")
+    assert not is_unreadable_content_type("text/html; charset=utf-8")
+    assert not is_unreadable_content_type(None)
+
+
+def test_response_valid():
+    """
+    Test that error, unreadable, and oversized responses are discarded, keeping their status code
+    """
+    assert response_valid(None, None, "https://example.com") is None
+
+    response = make_response(200, b"<html></html>")
+    assert response_valid(response, "text/html", "https://example.com") is response
+
+    for response, content_type in [
+        (make_response(404, b"<html></html>"), "text/html"),
+        (make_response(200, b"%PDF"), "application/pdf"),
+        (make_response(200, b"a" * 10000001), "text/html"),
+    ]:
+        discarded_response = response_valid(response, content_type, "https://example.com")
+        assert discarded_response is not response
+        assert discarded_response.status_code == response.status_code
+
+
+def fetch_with_content(content, content_type):
+    """Fetches a response through an HTTP client which returns the given content for every request."""
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, headers={"content-type": content_type}, content=content)
+    )
+
+    async def fetch_response():
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await fetch(client, "https://example.com", {})
+
+    return asyncio.run(fetch_response())
+
+
+def test_fetch_decodes_declared_encoding():
+    """
+    Test that a page declaring a non UTF-8 charset only in its HTML is decoded with that charset
+    """
+    content = (
+        '<html><head><meta charset="windows-1252"><title>Café – Police</title></head>'
+        '<body><h1>Résumé</h1></body></html>'
+    ).encode("windows-1252")
+
+    response = fetch_with_content(content, "text/html")
+    tags = parse_html(get_html(response))
+
+    assert tags["html_title"] == "Café – Police"
+    assert json.loads(tags["h1"]) == ["Résumé"]
+
+
+def test_fetch_decodes_header_encoding():
+    """
+    Test that the charset of the content-type header takes precedence over the charset declared in the HTML
+    """
+    content = '<html><head><meta charset="utf-8"><title>Café</title></head></html>'.encode("windows-1252")
+
+    response = fetch_with_content(content, "text/html; charset=windows-1252")
+
+    assert get_html_title(LexborHTMLParser(get_html(response))) == "Café"
+
+
+def test_get_response_retries_ssl_error_without_verification(monkeypatch):
+    """
+    Test that a website failing SSL verification is retried with the unverified client, and only that website
+    """
+    def verified_handler(request):
+        if request.url.host == "legacy.example.com":
+            raise httpx.ConnectError("SSL handshake failed") from ssl.SSLCertVerificationError("certificate verify failed")
+        return httpx.Response(200, headers={"content-type": "text/html"}, content=b"<title>Verified</title>")
+
+    def unverified_handler(request):
+        return httpx.Response(200, headers={"content-type": "text/html"}, content=b"<title>Unverified</title>")
+
+    async def get_titles():
+        verified_client = httpx.AsyncClient(transport=httpx.MockTransport(verified_handler))
+        unverified_client = httpx.AsyncClient(transport=httpx.MockTransport(unverified_handler))
+        monkeypatch.setattr(collector, "clients", {True: verified_client, False: unverified_client})
+
+        results = [
+            await get_response(collector.get_client(), "https://legacy.example.com", 0),
+            await get_response(collector.get_client(), "https://example.com", 1),
+        ]
+        await collector.close_client()
+        return [get_html_title(LexborHTMLParser(get_html(result["response"]))) for result in results]
+
+    assert asyncio.run(get_titles()) == ["Unverified", "Verified"]
+
+
+def test_render_js_launches_one_browser(monkeypatch):
+    """
+    Test that rendering responses launches a single browser, and renders at most max_renders pages at the same time
+    """
+    launches = []
+    renders = {"running": 0, "max_running": 0}
+
+    class FakeBrowser:
+        async def close(self):
+            pass
+
+    async def fake_launch(*args, **kwargs):
+        launches.append(FakeBrowser())
+        await asyncio.sleep(0)
+        return launches[-1]
+
+    monkeypatch.setattr(requests_html.pyppeteer, "launch", fake_launch)
+
+    async def render():
+        html_session = requests_html.AsyncHTMLSession()
+
+        class FakeHTML:
+            async def arender(self):
+                await html_session.browser
+                renders["running"] += 1
+                renders["max_running"] = max(renders["max_running"], renders["running"])
+                await asyncio.sleep(0)
+                renders["running"] -= 1
+
+        class FakeResponse:
+            ok = True
+            html = FakeHTML()
+
+        urls_responses = [{"url": f"https://example.com/{i}", "response": FakeResponse()} for i in range(8)]
+        await render_js(urls_responses, html_session, max_renders=4)
+        await html_session.close()
+
+    asyncio.run(render())
+
+    assert len(launches) == 1
+    assert renders["max_running"] == 4
+
+
+def test_fetch_raises_ssl_error_without_chain_cycle():
+    """
+    Test that an SSL error from the HTTP client is raised as a new SSLError, leaving the original exceptions unchanged
+    """
+    ssl_error = ssl.SSLCertVerificationError("certificate verify failed")
+
+    def handler(request):
+        raise httpx.ConnectError("SSL handshake failed") from ssl_error
+
+    async def fetch_response():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await fetch(client, "https://example.com", {})
+
+    with pytest.raises(requests.exceptions.SSLError) as exc_info:
+        asyncio.run(fetch_response())
+
+    assert isinstance(exc_info.value.__cause__, httpx.ConnectError)
+    assert ssl_error.__cause__ is None
@@ -7,6 +7,8 @@ This module contains the argument parser for command line arguments
 for the Common Crawler script.
 """
 
+COMMON_CRAWL_ID_REGEX = re.compile(r'CC-MAIN-\d{4}-\d{2}')
+
 def valid_common_crawl_id(common_crawl_id: str) -> bool:
     """
     Validate the Common Crawl ID format.
@@ -16,7 +18,7 @@ def valid_common_crawl_id(common_crawl_id: str) -> bool:
     Returns:
         True if the Common Crawl ID is valid, False otherwise
     """
-    return re.match(r'CC-MAIN-\d{4}-\d{2}', common_crawl_id) is not None
+    return COMMON_CRAWL_ID_REGEX.match(common_crawl_id) is not None
 
 def parse_args() -> argparse.Namespace:
     """
@@ -1,4 +1,9 @@
+import dbm
+import hashlib
 import json
+import threading
+
+import lz4.frame
 
 from util.miscellaneous_functions import get_file_path
 
@@ -6,6 +11,7 @@ from util.miscellaneous_functions import get_file_path
 This module contains classes for managing a cache of Common Crawl search results
 These classes include:
     - CommonCrawlerCache: a class for managing the cache logic of Common Crawl search results
+    - CommonCrawlerIndexCache: a class for storing Common Crawl index responses on disk
 """
 
 class CommonCrawlerCacheManager:
@@ -89,3 +95,65 @@ class CommonCrawlerCacheManager:
         """
         self.cache = {}
         print("Cache has been reset.")
+
+
+class CommonCrawlerIndexCache:
+    """
+    A class for storing the content of Common Crawl index responses on disk.
+    The index for a given crawl never changes, so a response for a crawl id, url, and page
+    can be reused by every later search instead of being requested again.
+    Content is stored LZ4 compressed in a dbm database, keyed by a hash of the search.
+    """
+    def __init__(self, file_name: str = "index_cache", directory=None):
+        """
+        Initializes the CommonCrawlerIndexCache object with a file name and directory.
+        Args:
+            file_name: the name of the database file
+            directory: the directory to store the database file
+        """
+        self.file_path = get_file_path(file_name, directory)
+        # dbm databases are not safe to access from multiple threads at once
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_key(index: str, url: str, page: int) -> bytes:
+        """
+        Builds the database key for a search.
+        Args:
+            index: the index of the common crawl
+            url: the url searched
+            page: the page number searched
+        Returns: bytes - the key for the search
+        """
+        return hashlib.sha256(f"{index}|{url}|{page}".encode()).digest()
+
+    def get(self, index: str, url: str, page: int) -> bytes | None:
+        """
+        Retrieves the content of a cached response.
+        Args:
+            index: the index of the common crawl
+            url: the url searched
+            page: the page number searched
+        Returns: bytes - the response content, or None if the search is not cached
+        """
+        key = self.get_key(index, url, page)
+        with self.lock, dbm.open(str(self.file_path), 'c') as db:
+            compressed_content = db.get(key)
+        if compressed_content is None:
+            return None
+        return lz4.frame.decompress(compressed_content)
+
+    def put(self, index: str, url: str, page: int, content: bytes) -> None:
+        """
+        Stores the content of a response.
+        Args:
+            index: the index of the common crawl
+            url: the url searched
+            page: the page number searched
+            content: the response content
+        Returns: None
+        """
+        key = self.get_key(index, url, page)
+        compressed_content = lz4.frame.compress(content)
+        with self.lock, dbm.open(str(self.file_path), 'c') as db:
+            db[key] = compressed_content
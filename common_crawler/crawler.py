@@ -1,10 +1,15 @@
-import json
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import quote_plus
 from http import HTTPStatus
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 
+from html_tag_collector.common import get_user_agent
+from .cache import CommonCrawlerIndexCache
 from .utils import URLWithParameters
 from dataclasses import dataclass
 from collections import namedtuple
@@ -31,11 +36,38 @@ class CommonCrawlerManager:
     It validates crawl ids, manages pagination, and aggregates results.
     """
 
-    def __init__(self, crawl_id='CC-MAIN-2023-50'):
+    def __init__(
+            self,
+            crawl_id='CC-MAIN-2023-50',
+            max_workers: int = 8,
+            index_cache: CommonCrawlerIndexCache = None,
+            request_interval: float = 1.0):
         self.crawl_id = crawl_id
+        self.max_workers = max_workers
+        self.index_cache = index_cache
+        # Requests from all threads are spaced at least this many seconds apart.
+        # Once per second is nice enough per common crawl doc.
+        self.request_interval = request_interval
+        self.next_request_time = 0.0
+        self.request_lock = threading.Lock()
         CC_INDEX_SERVER = 'http://index.commoncrawl.org/'
         INDEX_NAME = f'{self.crawl_id}-index'
         self.root_url = f'{CC_INDEX_SERVER}{INDEX_NAME}'
+        self.session = self.create_session()
+
+    @staticmethod
+    def create_session() -> requests.Session:
+        """
+        Creates a session which reuses connections to the Common Crawl Index Server
+        across page requests, rather than opening a new connection for each one.
+        Failed requests are retried by search_common_crawl_index, not by the session.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=16)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update({"User-Agent": get_user_agent(), "Accept-Encoding": "gzip"})
+        return session
 
     def crawl(self, search_term, keyword, start_page, num_pages) -> CommonCrawlResult:
         print(
@@ -45,35 +77,47 @@ class CommonCrawlerManager:
         url_results = []
 
         end_page = start_page + num_pages
-        last_page = start_page
-
-        for next_page in range(start_page, end_page):
-            records = self.search_common_crawl_index(search_term, next_page)
-
-            # If records were found, filter them and add to results
+        # If the first page fails, no page has been searched and it is searched again next run
+        last_page = start_page - 1
+
+        # Pages are independent requests to the same server, so fetch them concurrently
+        # over the shared session's connection pool, still rate limited by make_request
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.search_common_crawl_index, search_term, page): page
+                for page in range(start_page, end_page)
+            }
+            records_by_page = {futures[future]: future.result() for future in as_completed(futures)}
+
+        # Only advance over contiguous pages with results, so that a failed page is searched again next run
+        for page in sorted(records_by_page):
+            records = records_by_page[page]
             if not records:
-                continue
+                break
 
             keyword_urls = self.get_urls_with_keyword(records, keyword)
             url_results.extend(keyword_urls)
 
-            last_page = next_page
-
-            # Wait 5 seconds before making the next request, to avoid overloading the server
-            time.sleep(5)
+            last_page = page
 
         return CommonCrawlResult(last_page, url_results)
 
-    def search_common_crawl_index(self, url: str, page: int = 0, max_retries: int = 20) -> list[dict]:
+    def search_common_crawl_index(self, url: str, page: int = 0, max_retries: int = 20) -> list[bytes]:
         """
         This method is used to search the Common Crawl index for a given URL and page number
         Args:
             url: a URL to search for
             page: the page number to search
 
-        Returns: A list of records (dictionaries) containing the search results
+        Returns: A list of records (unparsed JSON lines) containing the search results
 
         """
+        if self.index_cache is not None:
+            content = self.index_cache.get(self.crawl_id, url, page)
+            if content is not None:
+                print(f"Using cached records for {url} on page {page}")
+                return self.split_records(content, url, page)
+
         encoded_url = quote_plus(url)
         search_url = URLWithParameters(self.root_url)
         search_url.add_parameter('url', encoded_url)
@@ -83,11 +127,14 @@ class CommonCrawlerManager:
         retries = 0
         delay = 1
 
-        # put HTTP GET request in re-try loop in case of rate limiting. Once per second is nice enough per common crawl doc.
+        # put HTTP GET request in re-try loop in case of rate limiting.
         while retries < max_retries:
             response = self.make_request(search_url)
             if response:
-                return self.process_response(response, url, page)
+                records = self.process_response(response, url, page)
+                if records and self.index_cache is not None:
+                    self.index_cache.put(self.crawl_id, url, page, response.content)
+                return records
 
             retries += 1
             print(f"Rate limit exceeded. Retrying in {delay} second(s)... (Attempt {retries}/{max_retries})")
@@ -101,23 +148,37 @@ class CommonCrawlerManager:
         Makes the HTTP GET request to the given search URL.
         Return the response if successful, None if rate-limited.
         """
+        self.wait_for_request_slot()
         try:
-            response = requests.get(str(search_url))
+            response = self.session.get(str(search_url))
             response.raise_for_status()
             return response
-        except requests.exception.RequestException as e:
-            if response.status_code == HTTPStatus.INTERNAL_SERVER_ERROR and 'SlowDown' in response.text:
+        except requests.exceptions.RequestException as e:
+            response = e.response
+            if response is not None and response.status_code == HTTPStatus.INTERNAL_SERVER_ERROR and 'SlowDown' in response.text:
                 return None
             else:
                 print(f"Failed to get records: {e}")
                 return None
 
-    def process_response(self, response: requests.Response, url: str, page: int) -> list[dict]:
-        """Processes the HTTP response and returns the parsed records if successful."""
+    def wait_for_request_slot(self) -> None:
+        """
+        Waits until the request interval has passed since the last request made by any thread.
+        """
+        with self.request_lock:
+            now = time.monotonic()
+            request_time = max(now, self.next_request_time)
+            self.next_request_time = request_time + self.request_interval
+        if request_time > now:
+            time.sleep(request_time - now)
+
+    def process_response(self, response: requests.Response, url: str, page: int) -> list[bytes]:
+        """
+        Processes the HTTP response and returns the records if successful.
+        Records are left as unparsed JSON lines, so that only those matching a keyword need to be parsed.
+        """
         if response.status_code == HTTPStatus.OK:
-            records = response.text.strip().split('\n')
-            print(f"Found {len(records)} records for {url} on page {page}")
-            return [json.loads(record) for record in records]
+            return self.split_records(response.content, url, page)
         elif 'First Page is 0, Last Page is 0' in response.text:
             print("No records exist in index matching the url search term")
             return None
@@ -126,5 +187,19 @@ class CommonCrawlerManager:
             return None
 
     @staticmethod
-    def get_urls_with_keyword(records: list[dict], keyword) -> list[str]:
-        return [record['url'] for record in records if keyword in record['url']]
+    def split_records(content: bytes, url: str, page: int) -> list[bytes]:
+        """Splits the content of an index response into its records, one JSON line each."""
+        records = [record for record in content.split(b'\n') if record]
+        print(f"Found {len(records)} records for {url} on page {page}")
+        return records
+
+    @staticmethod
+    def get_urls_with_keyword(records: list[bytes], keyword) -> list[str]:
+        """
+        Returns the urls of the records which contain the keyword.
+        Records are first filtered on their raw bytes, which discards most of them without parsing.
+        The parsed url is checked again, in case the keyword matched another field of the record.
+        """
+        encoded_keyword = keyword.encode()
+        matches = [orjson.loads(record) for record in records if encoded_keyword in record]
+        return [match['url'] for match in matches if keyword in match['url']]
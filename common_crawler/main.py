@@ -15,7 +15,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from util.huggingface_api_manager import HuggingFaceAPIManager
 from util.miscellaneous_functions import get_filename_friendly_timestamp
 from common_crawler.argparser import parse_args
-from common_crawler.cache import CommonCrawlerCacheManager
+from common_crawler.cache import CommonCrawlerCacheManager, CommonCrawlerIndexCache
 from common_crawler.crawler import CommonCrawlerManager, CommonCrawlResult
 from common_crawler.csv_manager import CSVManager
 from label_studio_interface.LabelStudioConfig import LabelStudioConfig
@@ -291,7 +291,8 @@ def process_crawl_and_upload(
         label_studio_data: list[dict]) -> CommonCrawlResult:
     # Initialize the CommonCrawlerManager
     crawler_manager = CommonCrawlerManager(
-        args.common_crawl_id
+        args.common_crawl_id,
+        index_cache=CommonCrawlerIndexCache(directory=args.data_dir)
     )
     # Determine the pages to search, based on the last page searched
     start_page = last_page + 1
@@ -0,0 +1,42 @@
+import hashlib
+import shelve
+
+# Key the parser version is stored under, which cannot collide with the hex digests the tags are stored under
+VERSION_KEY = '__version__'
+
+
+class ParsedHTMLCache:
+    """Stores the tags parsed from a page's HTML, keyed by a hash of the HTML.
+
+    Tags parsed from HTML only depend on the HTML itself, so a page that has not changed since it was last collected does not need to be parsed again.
+    The cache is cleared when it is opened with a different parser version, so tags are not reused after the parser changes.
+    """
+
+    def __init__(self, cache_file='parsed_html_cache', version=1):
+        self.cache_file = cache_file
+        self.version = version
+        self.cache = None
+
+    def open_cache(self):
+        if self.cache is None:
+            self.cache = shelve.open(self.cache_file)
+            if self.cache.get(VERSION_KEY) != self.version:
+                self.cache.close()
+                self.cache = shelve.open(self.cache_file, flag='n')
+                self.cache[VERSION_KEY] = self.version
+        return self.cache
+
+    def close_cache(self):
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+
+    @staticmethod
+    def get_key(html):
+        return hashlib.blake2b(html.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+    def get(self, html):
+        return self.open_cache().get(self.get_key(html))
+
+    def set(self, html, parsed_tags):
+        self.open_cache()[self.get_key(html)] = parsed_tags
@@ -2,18 +2,28 @@ from urllib.parse import urlparse
 
 import requests
 from bs4 import BeautifulSoup
+import asyncio
 import json
 import os
+import re
 import ssl
+import threading
 
 from common import get_user_agent
 
 DEBUG = False
+# Matches the scheme and host of a url, also used by the collector to extract root urls and url paths
+ROOT_URL_PATTERN = r"[^:/?#]+://[^/?#]*"
+ROOT_URL_REGEX = re.compile(ROOT_URL_PATTERN)
 
 class RootURLCache:
     def __init__(self, cache_file='url_cache.json'):
         self.cache_file = cache_file
         self.cache = self.load_cache()
+        # Titles returned for root urls that could not be retrieved, kept in memory so they are not requested again
+        self.failed_titles = {}
+        # Titles can be retrieved from multiple threads by prefetch
+        self.lock = threading.Lock()
 
     def load_cache(self):
         if os.path.exists(self.cache_file):
@@ -31,16 +41,33 @@ class RootURLCache:
         with open(self.cache_file, 'w') as f:
             json.dump(self.cache, f, indent=4)
 
-    def get_title(self, url):
+    def get_root_url(self, url):
         if not url.startswith('http'):
             url = "https://" + url
 
+        # Only the scheme and host are needed, so match them directly rather than parsing the whole url
+        match = ROOT_URL_REGEX.match(url)
+        if match:
+            return match.group()
+
         parsed_url = urlparse(url)
-        root_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+        return f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+    async def prefetch(self, url):
+        # Retrieves the title in a separate thread so titles for multiple root urls can be retrieved at once
+        root_url = self.get_root_url(url)
+        if root_url not in self.cache and root_url not in self.failed_titles:
+            await asyncio.to_thread(self.get_title, url)
+
+    def get_title(self, url):
+        root_url = self.get_root_url(url)
         headers = {
             "User-Agent": get_user_agent(),
         }
 
+        if root_url in self.failed_titles:
+            return self.failed_titles[root_url]
+
         if root_url not in self.cache:
             try:
                 response = requests.get(root_url, headers=headers, timeout=120)
@@ -50,9 +77,9 @@ class RootURLCache:
                 try:
                     response = requests.get(root_url, headers=headers, timeout=120, verify=False)
                 except Exception as e:
-                    return self.handle_exception(e)
+                    return self.handle_exception(root_url, e)
             except Exception as e:
-                return self.handle_exception(e)
+                return self.handle_exception(root_url, e)
 
             soup = BeautifulSoup(response.text, 'html.parser')
             try:
@@ -60,8 +87,9 @@ class RootURLCache:
             except AttributeError:
                 title = ""
             
-            self.cache[root_url] = title
-            self.save_cache()
+            with self.lock:
+                self.cache[root_url] = title
+                self.save_cache()
 
             # Prevents most bs4 memory leaks
             if soup.html:
@@ -71,8 +99,11 @@ class RootURLCache:
 
         return self.cache[root_url]
 
-    def handle_exception(self, e):
+    def handle_exception(self, root_url, e):
         if DEBUG:
-            return f"Error retrieving title: {e}"
+            title = f"Error retrieving title: {e}"
         else:
-            return ""
+            title = ""
+
+        self.failed_titles[root_url] = title
+        return title
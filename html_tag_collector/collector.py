@@ -20,62 +20,94 @@ from concurrent.futures import as_completed, ThreadPoolExecutor
 import sys
 import traceback
 import multiprocessing
+import queue
+import io
+import re
 
 import requests
-from requests_html import AsyncHTMLSession
+from requests.structures import CaseInsensitiveDict
+from requests_html import AsyncHTMLSession, HTMLResponse
+import httpx
+from w3lib.encoding import html_body_declared_encoding, http_content_type_encoding, read_bom
 import asyncio
 import pyppeteer
 from tqdm import tqdm
 from tqdm.asyncio import tqdm
-import bs4
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 import polars as pl
-from urllib.parse import urlparse
 
-from RootURLCache import RootURLCache
+from RootURLCache import ROOT_URL_PATTERN, RootURLCache
+from ParsedHTMLCache import ParsedHTMLCache
 from common import get_user_agent
 from DataClassTags import Tags
 
 
 # Define the list of header tags we want to extract
 header_tags = ["h1", "h2", "h3", "h4", "h5", "h6"]
+# Tags which are parsed from the HTML content alone
+content_tags = ["html_title", "meta_description", *header_tags, "div_text"]
+# Responses larger than 10 MB are discarded to prevent out of memory errors
+MAX_CONTENT_LENGTH = 10000000
+UNREADABLE_CONTENT_TYPE_REGEX = re.compile(r"pdf|excel|msword|image|rtf|zip|octet|csv|json")
+WHITESPACE_REGEX = re.compile(r"\s+")
 DEBUG = False  # Set to True to enable debug output
 VERBOSE = False  # Set to True to print dataframe each batch
 root_url_cache = RootURLCache()
+# Increment whenever parse_html's output changes, so tags cached by the previous version are not reused
+PARSER_VERSION = 1
+parsed_html_cache = ParsedHTMLCache(version=PARSER_VERSION)
+# Shared across batches so that keep-alive connections are reused, keyed by whether they verify SSL certificates, see get_client()
+clients = {}
 
 
-def process_urls(manager_list, render_javascript):
+def process_urls(df, loop, html_session=None):
     """Process a list of urls and retrieve their HTML tags.
 
     Args:
-        manager_list (shared list[polars dataframe]): shared list containing the polars dataframe, used to send and retrieve data from outside the current process.
-        render_javascript (bool): Whether or not to render webpage's JavaScript rendered HTML.
+        df (polars dataframe): DataFrame containing the urls in a 'url' column.
+        loop (AbstractEventLoop): Event loop to retrieve the responses with.
+        html_session (AsyncHTMLSession): Session to retrieve the responses and render their JavaScript with, None if JavaScript is not rendered.
 
     Returns:
-        list: List of dicts with HTML tags.
+        polars dataframe: DataFrame with the urls and their HTML tags.
     """
-    df = manager_list[0]
-    urls = df.select(pl.col("url")).rows()
-    new_urls = []
-    for url in urls:
-        if url[0] is not None and not url[0].startswith("http"):
-            new_urls.append("https://" + url[0])
-        else:
-            new_urls.append(url[0])
-
-    loop = asyncio.get_event_loop()
-    loop.set_exception_handler(exception_handler)
-    future = asyncio.ensure_future(run_get_response(new_urls))
+    urls_df = df.select(
+        pl.col("url"),
+        pl.when(pl.col("url").str.starts_with("http"))
+        .then(pl.col("url"))
+        .otherwise("https://" + pl.col("url"))
+        .alias("full_url"),
+    ).with_columns(
+        # Drop hostname from urls to reduce training bias, and remove the leading and trailing backslash
+        pl.col("full_url")
+        .str.extract(f"^{ROOT_URL_PATTERN}([^?#]*)", 1)
+        .str.strip_prefix("/")
+        .str.strip_suffix("/")
+        .fill_null("")
+        .alias("url_path")
+    )
+    urls = urls_df["url"].to_list()
+    new_urls = urls_df["full_url"].to_list()
+    url_paths = urls_df["url_path"].to_list()
+    # Many urls in a batch share a root url, so each root page's title only needs to be retrieved once
+    root_urls = (
+        urls_df.select(pl.col("full_url").str.extract(f"^({ROOT_URL_PATTERN})", 1).unique().drop_nulls())
+        .to_series()
+        .to_list()
+    )
+
+    future = asyncio.gather(run_get_response(new_urls, html_session), prefetch_root_titles(root_urls))
     loop.run_until_complete(future)
-    results = future.result()
+    results, _ = future.result()
 
     results.sort(key=lambda d: d["index"])
     urls_and_responses = [
-        {"index": result["index"], "url": urls[i], "response": result["response"]} for i, result in enumerate(results)
+        {"index": result["index"], "url": urls[i], "url_path": url_paths[i], "response": result["response"]}
+        for i, result in enumerate(results)
     ]
 
-    if render_javascript:
-        future = asyncio.ensure_future(render_js(urls_and_responses))
+    if html_session is not None:
+        future = asyncio.ensure_future(render_js(urls_and_responses, html_session), loop=loop)
         loop.run_until_complete(future)
         results = future.result()
 
@@ -88,8 +120,43 @@ def process_urls(manager_list, render_javascript):
     header_tags_df = pl.DataFrame(urls_and_headers)
     clean_header_tags_df = header_tags_df.with_columns(pl.all().fill_null(""))
 
-    # Return updated DataFrame
-    manager_list[0] = clean_header_tags_df
+    return clean_header_tags_df
+
+
+def collector_worker(input_queue, output_queue, render_javascript):
+    """Processes batches of urls sent through the input queue until None is received.
+
+    The event loop, client session, browser session and caches are set up once and shared by every batch, and are closed
+    when the worker stops, even if a batch fails.
+
+    Args:
+        input_queue (Queue): Queue of polars dataframes containing urls in a 'url' column, in Arrow IPC format.
+        output_queue (Queue): Queue the polars dataframes with HTML tags are returned through, in Arrow IPC format.
+        render_javascript (bool): Whether or not to render webpage's JavaScript rendered HTML.
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    loop.set_exception_handler(exception_handler)
+    html_session = None
+    # Only start a browser session when the responses need their JavaScript rendered
+    if render_javascript:
+        html_session = AsyncHTMLSession(workers=100, browser_args=["--no-sandbox", f"--user-agent={get_user_agent()}"])
+
+    try:
+        while True:
+            data = input_queue.get()
+            if data is None:
+                break
+
+            df = process_urls(read_ipc_bytes(data), loop, html_session)
+            output_queue.put(write_ipc_bytes(df))
+    finally:
+        if html_session is not None:
+            # Also closes the browser if one was launched to render JavaScript
+            loop.run_until_complete(html_session.close())
+        loop.run_until_complete(close_client())
+        loop.close()
+        parsed_html_cache.close_cache()
 
 
 def exception_handler(loop, context):
@@ -98,18 +165,56 @@ def exception_handler(loop, context):
         print(msg)
 
 
-async def run_get_response(urls):
+def get_client(verify=True):
+    """Returns the shared HTTP client, creating it if it does not exist yet.
+
+    The client's connection pool keeps connections alive between requests, so repeat hosts skip the connection handshake,
+    and requests to hosts supporting HTTP/2 are multiplexed over a single connection.
+
+    Args:
+        verify (bool): Whether or not the client verifies SSL certificates. The unverified client is only used to retry
+            websites that failed SSL verification.
+
+    Returns:
+        httpx.AsyncClient: Client used to retrieve responses that do not need JavaScript rendered.
+    """
+    client = clients.get(verify)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            http2=True,
+            verify=verify,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=40),
+            timeout=httpx.Timeout(120.0),
+            headers={"User-Agent": get_user_agent()},
+            follow_redirects=True,
+        )
+        clients[verify] = client
+
+    return client
+
+
+async def close_client():
+    """Closes the shared HTTP clients that are open."""
+    for client in clients.values():
+        if not client.is_closed:
+            await client.aclose()
+    clients.clear()
+
+
+async def run_get_response(urls, html_session=None):
     """Asynchronously retrieves responses from a list of urls.
 
     Args:
         urls (list): List of urls.
+        html_session (AsyncHTMLSession): Session to retrieve responses that will have their JavaScript rendered with, the
+            shared HTTP client is used if None.
 
     Returns:
         Future: Future with Response objects.
     """
     tasks = []
     urllib3.disable_warnings()
-    session = AsyncHTMLSession(workers=100, browser_args=["--no-sandbox", f"--user-agent={get_user_agent()}"])
+    session = html_session if html_session is not None else get_client()
 
     print("Retrieving HTML tags...")
     for i, url in enumerate(urls):
@@ -118,7 +223,6 @@ async def run_get_response(urls):
 
     results = await tqdm.gather(*tasks)
 
-    await session.close()
     return results
 
 
@@ -126,7 +230,7 @@ async def get_response(session, url, index):
     """Retrieves GET response for given url.
 
     Args:
-        session (AsyncHTMLSession): Browser session used to retreive responses.
+        session (AsyncHTMLSession|httpx.AsyncClient): Session used to retreive responses.
         url (str): Url to request.
         index (int): Index of the url to keep results in the same order.
 
@@ -143,15 +247,15 @@ async def get_response(session, url, index):
         url = url.removesuffix(".json")
 
     try:
-        response = await session.get(url, headers=headers, timeout=120)
+        response = await fetch(session, url, headers)
     except (requests.exceptions.SSLError, ssl.SSLError):
         # This error is raised when the website uses a legacy SSL version, which is not supported by requests
         if DEBUG:
             print("SSLError:", url)
 
         # Retry without SSL verification
-        response = await session.get(url, headers=headers, timeout=120, verify=False)
-    except requests.exceptions.ConnectionError:
+        response = await fetch(session, url, headers, verify=False)
+    except (requests.exceptions.ConnectionError, httpx.ConnectError):
         # Sometimes this error is raised because the provided url uses http when it should be https and the website does not handle it properly
         if DEBUG:
             print("MaxRetryError:", url)
@@ -159,8 +263,14 @@ async def get_response(session, url, index):
         if not url[4] == "s":
             url = url[:4] + "s" + url[4:]
             # Retry with https
-            response = await session.get(url, headers=headers, timeout=120)
-    except (urllib3.exceptions.LocationParseError, requests.exceptions.ReadTimeout) as e:
+            response = await fetch(session, url, headers)
+    except (
+        urllib3.exceptions.LocationParseError,
+        requests.exceptions.ReadTimeout,
+        httpx.InvalidURL,
+        httpx.UnsupportedProtocol,
+        httpx.TimeoutException,
+    ) as e:
         if DEBUG:
             print(f"{type(e).__name__}: {url}")
     except Exception as e:
@@ -183,6 +293,126 @@ async def get_response(session, url, index):
         return {"index": index, "response": response}
 
 
+async def fetch(session, url, headers, verify=True):
+    """Sends a GET request for the url with the given session.
+
+    Args:
+        session (AsyncHTMLSession|httpx.AsyncClient): Session used to retreive the response.
+        url (str): Url to request.
+        headers (dict): Request headers.
+        verify (bool): Whether or not to verify SSL certificates. Requests that are not verified are sent with the
+            unverified HTTP client in place of the given one.
+
+    Returns:
+        Response: Response object, an HTMLResponse if the session is an AsyncHTMLSession.
+
+    Raises:
+        requests.exceptions.SSLError: The HTTP client failed to connect because of an SSL error.
+    """
+    if isinstance(session, AsyncHTMLSession):
+        return await session.get(url, headers=headers, timeout=120, verify=verify)
+
+    if not verify:
+        session = get_client(verify=False)
+
+    try:
+        return await stream_response(session, url, headers)
+    except httpx.ConnectError as e:
+        ssl_error = get_ssl_error(e)
+        if ssl_error is None:
+            raise
+        # Raised as an SSLError so that get_response retries it without SSL verification
+        raise requests.exceptions.SSLError(str(ssl_error)) from e
+
+
+def get_ssl_error(e):
+    """Finds the SSL error that caused an exception.
+
+    Args:
+        e (Exception): Exception raised while connecting.
+
+    Returns:
+        ssl.SSLError|None: The SSL error, None if the exception was not caused by one.
+    """
+    while e is not None:
+        if isinstance(e, ssl.SSLError):
+            return e
+        e = e.__cause__ or e.__context__
+
+    return None
+
+
+async def stream_response(client, url, headers):
+    """Streams the GET response for the url, only downloading content that can be read.
+
+    Args:
+        client (httpx.AsyncClient): Client used to retreive the response.
+        url (str): Url to request.
+        headers (dict): Request headers.
+
+    Returns:
+        Response: Response object, without content if it is too large or unreadable.
+    """
+    async with client.stream("GET", url, headers=headers) as res:
+        # Wrap the content in a Response object so it is handled the same as an HTMLResponse
+        response = requests.Response()
+        response.status_code = res.status_code
+        response._content = b""
+
+        # Content that would be discarded by response_valid is not downloaded at all
+        content_length = res.headers.get("content-length")
+        if (
+            res.is_error
+            or content_length is not None
+            and content_length.isdigit()
+            and int(content_length) > MAX_CONTENT_LENGTH
+            or is_unreadable_content_type(res.headers.get("content-type"))
+        ):
+            if DEBUG:
+                print("Large or unreadable content not downloaded:", content_length, url)
+            return response
+
+        # The content length header can be missing or wrong, so stop reading once the limit is passed
+        content = bytearray()
+        async for chunk in res.aiter_bytes(65536):
+            content += chunk
+            if len(content) > MAX_CONTENT_LENGTH:
+                if DEBUG:
+                    print("Large content download stopped:", url)
+                return response
+
+        response.headers = CaseInsensitiveDict(res.headers)
+        response.url = str(res.url)
+        response._content = bytes(content)
+        response.encoding = get_encoding(res.headers.get("content-type"), response.content)
+
+    return response
+
+
+def get_encoding(content_type, content):
+    """Detects the encoding of a response's content.
+
+    The byte order mark takes precedence, then the charset of the content-type header, then the charset declared in the HTML.
+
+    Args:
+        content_type (str): The content type returned by the website.
+        content (bytes): The response content.
+
+    Returns:
+        str|None: The encoding, or None if none is declared, in which case it is guessed from the content when decoded.
+    """
+    bom_encoding, _ = read_bom(content)
+    if bom_encoding is not None:
+        return bom_encoding
+
+    if content_type is not None:
+        header_encoding = http_content_type_encoding(content_type)
+        if header_encoding is not None:
+            return header_encoding
+
+    return html_body_declared_encoding(content)
+
+
 def response_valid(response, content_type, url):
     """Checks the response to see if content is too large, unreadable, or invalid response code. The response is discarded if it is invalid.
 
@@ -194,19 +424,17 @@ def response_valid(response, content_type, url):
     Returns:
         Response: The response object is returned either unmodified or discarded.
     """    
-    # If the response size is greater than 10 MB
+    # There is nothing to discard if there was an error during connection
+    if response is None:
+        return response
+
+    # If the response code from the website is an error
     # or the response is an unreadable content type
-    # or the response code from the website is not in the 200s
+    # or the response size is greater than 10 MB
     if (
-        response is not None
-        and len(response.content) > 10000000
-        or content_type is not None
-        and any(
-            filtered_type in content_type
-            for filtered_type in ["pdf", "excel", "msword", "image", "rtf", "zip", "octet", "csv", "json"]
-        )
-        or response is not None
-        and not response.ok
+        not response.ok
+        or is_unreadable_content_type(content_type)
+        or len(response.content) > MAX_CONTENT_LENGTH
     ):
         # Discard the response content to prevent out of memory errors
         if DEBUG:
@@ -218,48 +446,85 @@ def response_valid(response, content_type, url):
     return response
 
 
-async def render_js(urls_responses):
+def is_unreadable_content_type(content_type):
+    """Checks if the content type is one that cannot be parsed for HTML tags.
+
+    Args:
+        content_type (str): The content type returned by the website.
+
+    Returns:
+        bool: True if the content type is unreadable, False otherwise.
+    """
+    return content_type is not None and UNREADABLE_CONTENT_TYPE_REGEX.search(content_type) is not None
+
+
+async def prefetch_root_titles(root_urls):
+    """Retrieves the root page titles for a list of root urls into the root url cache.
+
+    Args:
+        root_urls (list): List of unique root urls.
+    """
+    await asyncio.gather(*[root_url_cache.prefetch(root_url) for root_url in root_urls])
+
+
+async def render_js(urls_responses, html_session, max_renders=4):
     """Renders JavaScript from a list of urls.
 
     Args:
         urls_responses (dict): Dictionary containing urls and their responses.
+        html_session (AsyncHTMLSession): Session the responses were retrieved with, whose browser renders the pages.
+        max_renders (int): Maximum number of pages to render at the same time, each one is a browser page held in memory.
     """
     print("Rendering JavaScript...")
-    for url_response in tqdm(urls_responses):
-        res = url_response["response"]
-
-        if res is None or not res.ok:
-            continue
+    semaphore = asyncio.Semaphore(max_renders)
+    tasks = [
+        render_response(url_response, semaphore)
+        for url_response in urls_responses
+        if url_response["response"] is not None and url_response["response"].ok
+    ]
+    if not tasks:
+        return
 
+    # The session only launches a browser if it has none yet, so concurrent renders would each launch their own
+    try:
+        await html_session.browser
+    except Exception as e:
+        # Responses are kept unrendered, the same as when a single render fails
         if DEBUG:
-            print("Rendering", url_response["url"][0])
-        try:
-            task = asyncio.create_task(res.html.arender())
-        except AttributeError:
-            continue
+            print(traceback.format_exc())
+            print(str(e))
+        return
 
-        # Some websites will cause the rendering to hang indefinitely so we cancel the task if more than 15 seconds have elapsed
-        time_elapsed = 0
-        while not task.done():
-            time_elapsed += 1
-            await asyncio.sleep(0.1)
+    await tqdm.gather(*tasks)
 
-            if time_elapsed > 150:
-                task.cancel()
-                break
 
+async def render_response(url_response, semaphore):
+    """Renders JavaScript for a single url's response.
+
+    Args:
+        url_response (dict): Dictionary containing the url and its response.
+        semaphore (Semaphore): Semaphore limiting how many pages are rendered at the same time.
+    """
+    res = url_response["response"]
+
+    async with semaphore:
+        if DEBUG:
+            print("Rendering", url_response["url"])
         try:
-            await task
+            # Some websites will cause the rendering to hang indefinitely so it is cancelled after 15 seconds
+            await asyncio.wait_for(res.html.arender(), timeout=15)
+        except AttributeError:
+            pass
         except (pyppeteer.errors.PageError, pyppeteer.errors.NetworkError) as e:
             if DEBUG:
                 print(f"{type(e).__name__}")
+        except asyncio.TimeoutError:
+            if DEBUG:
+                print("Rendering cancelled")
         except Exception as e:
             if DEBUG:
                 print(traceback.format_exc())
                 print(str(e))
-        except asyncio.CancelledError:
-            if DEBUG:
-                print("Rendering cancelled")
 
 
 def parse_response(url_response):
@@ -275,7 +540,8 @@ def parse_response(url_response):
     res = url_response["response"]
     tags.index = url_response["index"]
 
-    tags.url, tags.url_path = get_url(url_response)
+    tags.url = url_response["url"]
+    tags.url_path = url_response["url_path"]
 
     tags.root_page_title = remove_excess_whitespace(root_url_cache.get_title(tags.url))
 
@@ -283,51 +549,69 @@ def parse_response(url_response):
     if verified is False:
         return asdict(tags)
 
-    parser = get_parser(res)
-    if parser is False:
+    if not is_readable(res):
         return asdict(tags)
 
     try:
-        soup = BeautifulSoup(res.html.html, parser)
-    except (bs4.builder.ParserRejectedMarkup, AssertionError, AttributeError):
+        html = get_html(res)
+    except AttributeError:
         return asdict(tags)
 
-    tags.html_title = get_html_title(soup)
+    # Only parse HTML that has not been parsed before
+    parsed_tags = parsed_html_cache.get(html)
+    if parsed_tags is None:
+        parsed_tags = parse_html(html)
+        parsed_html_cache.set(html, parsed_tags)
 
-    tags.meta_description = get_meta_description(soup)
+    for tag, content in parsed_tags.items():
+        setattr(tags, tag, content)
 
-    tags = get_header_tags(tags, soup)
+    return asdict(tags)
 
-    tags.div_text = get_div_text(soup)
 
-    # Prevents most bs4 memory leaks
-    if soup.html:
-        soup.html.decompose()
+def parse_html(html):
+    """Parses the relevant HTML tags from a page's HTML.
 
-    return asdict(tags)
+    Args:
+        html (str): HTML content to parse.
+
+    Returns:
+        dict: Dictionary containing the tags parsed from the HTML, empty if the HTML could not be parsed.
+    """
+    tags = Tags()
+
+    try:
+        tree = LexborHTMLParser(html)
+    except TypeError:
+        return {}
+
+    # Script and style contents are not page text
+    tree.strip_tags(["script", "style", "template"])
+
+    tags.html_title = get_html_title(tree)
+
+    tags.meta_description = get_meta_description(tree)
+
+    tags = get_header_tags(tags, tree)
+
+    tags.div_text = get_div_text(tree)
 
+    return {tag: getattr(tags, tag) for tag in content_tags}
 
-def get_url(url_response):
-    """Returns the url and url_path.
+
+def get_html(res):
+    """Returns the HTML of a response, including any rendered JavaScript.
 
     Args:
-        url_response (list[dict]): List of dictionaries containing urls and their responses.
+        res (HTMLResponse|Response): Response object to read the HTML from.
 
     Returns:
-        (str, str): Tuple with the url and url_path.
+        str: The HTML content.
     """
-    url = url_response["url"][0]
-    new_url = url
-    if not new_url.startswith("http"):
-        new_url = "https://" + new_url
-
-    # Drop hostname from urls to reduce training bias
-    url_path = urlparse(new_url).path[1:]
-    # Remove trailing backslash
-    if url_path and url_path[-1] == "/":
-        url_path = url_path[:-1]
+    if isinstance(res, HTMLResponse):
+        return res.html.html
 
-    return url, url_path
+    return res.text
 
 
 def verify_response(res):
@@ -352,110 +636,114 @@ def verify_response(res):
     return VerifiedResponse(True, http_response)
 
 
-def get_parser(res):
-    """Retrieves the parser type to use with BeautifulSoup.
+def is_readable(res):
+    """Checks the content-type of a response to see if it can be parsed as HTML.
 
     Args:
         res (HTMLResponse|Response): Response object to read the content-type from.
 
     Returns:
-        str|bool: A string of the parser to use, or False if not readable.
+        bool: True if the content is HTML or XML, False otherwise.
     """
-    # Attempt to read the content-type, set the parser accordingly to avoid warning messages
     try:
         content_type = res.headers["content-type"]
     except KeyError:
         return False
 
     # If content type does not contain "html" or "xml" then we can assume that the content is unreadable
-    if "html" in content_type:
-        parser = "lxml"
-    elif "xml" in content_type:
-        parser = "lxml-xml"
-    else:
-        return False
-
-    return parser
+    return "html" in content_type or "xml" in content_type
 
 
-def get_html_title(soup):
-    """Retrieves the HTML title from a BeautifulSoup object.
+def get_html_title(tree):
+    """Retrieves the HTML title from a parsed HTML tree.
 
     Args:
-        soup (BeautifulSoup): BeautifulSoup object to pull the HTML title from.
+        tree (LexborHTMLParser): Parsed HTML tree to pull the HTML title from.
 
     Returns:
         str: The HTML title.
     """
     html_title = ""
 
-    if soup.title is not None and soup.title.string is not None:
-        html_title = remove_excess_whitespace(soup.title.string)
+    title = tree.css_first("title")
+    if title is not None:
+        html_title = remove_excess_whitespace(title.text())
 
     return html_title
 
 
-def get_meta_description(soup):
-    """Retrieves the meta description from a BeautifulSoup object.
+def get_meta_description(tree):
+    """Retrieves the meta description from a parsed HTML tree.
 
     Args:
-        soup (BeautifulSoup): BeautifulSoup object to pull the meta description from.
+        tree (LexborHTMLParser): Parsed HTML tree to pull the meta description from.
 
     Returns:
         str: The meta description.
     """
-    meta_tag = soup.find("meta", attrs={"name": "description"})
-    try:
-        meta_description = remove_excess_whitespace(meta_tag["content"]) if meta_tag is not None else ""
-    except KeyError:
+    meta_tag = tree.css_first('meta[name="description"]')
+    if meta_tag is None:
         return ""
 
+    content = meta_tag.attributes.get("content")
+    meta_description = remove_excess_whitespace(content) if content is not None else ""
+
     return meta_description
 
 
-def get_header_tags(tags, soup):
+def get_header_tags(tags, tree):
     """Updates the Tags DataClass with the header tags.
 
     Args:
         tags (Tags): DataClass for relevant HTML tags.
-        soup (BeautifulSoup): BeautifulSoup object to pull the header tags from.
+        tree (LexborHTMLParser): Parsed HTML tree to pull the header tags from.
 
     Returns:
         Tags: DataClass with updated header tags.
     """
+    # Select every header tag in a single pass over the tree, then group them by tag
+    header_content = {header_tag: [] for header_tag in header_tags}
+    for header in tree.css(",".join(header_tags)):
+        # Drops headers containing links to reduce training bias
+        if header.css_first("a"):
+            continue
+        header_content[header.tag].append(header.text(separator=" ", strip=True))
+
     for header_tag in header_tags:
-        headers = soup.find_all(header_tag)
-        # Retrieves and drops headers containing links to reduce training bias
-        header_content = [header.get_text(" ", strip=True) for header in headers if not header.a]
-        tag_content = json.dumps(header_content, ensure_ascii=False)
+        tag_content = json.dumps(header_content[header_tag], ensure_ascii=False)
         setattr(tags, header_tag, tag_content)
 
     return tags
 
 
-def get_div_text(soup):
-    """Retrieves the div text from a BeautifulSoup object.
+def get_div_text(tree):
+    """Retrieves the div text from a parsed HTML tree.
 
     Args:
-        soup (BeautifulSoup): BeautifulSoup object to pull the div text from.
+        tree (LexborHTMLParser): Parsed HTML tree to pull the div text from.
 
     Returns:
         str: The div text.
     """
     # Extract max 500 words of text from HTML <div>'s
-    div_text = ""
     MAX_WORDS = 500
-    for div in soup.find_all("div"):
-        text = div.get_text(" ", strip=True)
-        if text:
-            # Check if adding the current text exceeds the word limit
-            if len(div_text.split()) + len(text.split()) <= MAX_WORDS:
-                div_text += text + " "
-            else:
-                break  # Stop adding text if word limit is reached
+    div_texts = []
+    word_count = 0
+    for div in tree.css("div"):
+        text = div.text(separator=" ", strip=True)
+        if not text:
+            continue
+
+        # Only the div's own text is split, rather than all of the text collected so far
+        text_word_count = len(text.split())
+        if word_count + text_word_count > MAX_WORDS:
+            break  # Stop adding text if word limit is reached
+
+        div_texts.append(text)
+        word_count += text_word_count
 
     # Truncate to 5000 characters in case of run-on 'words'
-    div_text = div_text[: MAX_WORDS * 10]
+    div_text = " ".join(div_texts)[: MAX_WORDS * 10]
 
     return div_text
 
@@ -469,19 +757,81 @@ def remove_excess_whitespace(s):
     Returns:
         str: Clean string with excess whitespace stripped.
     """
-    return " ".join(s.split()).strip()
+    return WHITESPACE_REGEX.sub(" ", s).strip()
 
 
-def collector_main(df, render_javascript=False):
-    context = multiprocessing.get_context("spawn")
-    manager = context.Manager()
-    manager_list = manager.list([df])
+def write_ipc_bytes(df):
+    """Writes a DataFrame to bytes in Arrow IPC format, to be sent between processes.
+
+    The DataFrame is written as a single buffer, rather than being pickled column by column.
 
-    process = context.Process(target=process_urls, args=(manager_list, render_javascript))
-    process.start()
-    process.join()
+    Args:
+        df (polars dataframe): DataFrame to write.
 
-    return manager_list[0]
+    Returns:
+        bytes: The DataFrame in Arrow IPC format.
+    """
+    buffer = io.BytesIO()
+    df.write_ipc(buffer)
+    return buffer.getvalue()
+
+
+def read_ipc_bytes(data):
+    """Reads a DataFrame from bytes in Arrow IPC format.
+
+    Args:
+        data (bytes): The DataFrame in Arrow IPC format.
+
+    Returns:
+        polars dataframe: The DataFrame that was written.
+    """
+    return pl.read_ipc(io.BytesIO(data))
+
+
+class CollectorProcess:
+    """Runs the tag collector in a separate process which is kept alive between batches.
+
+    Use as a context manager, the process is stopped once all batches have been collected.
+    """
+
+    def __init__(self, render_javascript=False):
+        context = multiprocessing.get_context("spawn")
+        self.input_queue = context.Queue()
+        self.output_queue = context.Queue()
+        self.process = context.Process(
+            target=collector_worker, args=(self.input_queue, self.output_queue, render_javascript)
+        )
+
+    def __enter__(self):
+        self.process.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        # None tells the worker there are no more batches
+        self.input_queue.put(None)
+        self.process.join()
+
+    def collect(self, df):
+        """Collects the HTML tags for a batch of urls.
+
+        Args:
+            df (polars dataframe): DataFrame containing the urls in a 'url' column.
+
+        Returns:
+            polars dataframe: DataFrame with the urls and their HTML tags.
+        """
+        self.input_queue.put(write_ipc_bytes(df))
+        while True:
+            try:
+                return read_ipc_bytes(self.output_queue.get(timeout=1))
+            except queue.Empty:
+                if not self.process.is_alive():
+                    raise RuntimeError("Tag collector process exited before the batch was collected")
+
+
+def collector_main(df, render_javascript=False):
+    with CollectorProcess(render_javascript=render_javascript) as collector:
+        return collector.collect(df)
 
 
 def process_in_batches(df, render_javascript=False, batch_size=200):
@@ -496,8 +846,8 @@ def process_in_batches(df, render_javascript=False, batch_size=200):
         cumulative_df: polars dataframe containing responses from all batches
 
     """
-    # Create an empty DataFrame to store the final cumulative result
-    cumulative_df = pl.DataFrame()
+    # Collect the DataFrame of each batch, they are concatenated once all batches are done
+    batch_dfs = []
 
     # Calculate the number of batches needed
     num_batches = (len(df) + batch_size - 1) // batch_size
@@ -506,23 +856,16 @@ def process_in_batches(df, render_javascript=False, batch_size=200):
     print(f"Batch size: {batch_size}")
     print(f"Number of Batches: {num_batches} \n")
 
-    # Process the DataFrame in batches
-    for i in range(num_batches):
-        start_idx = i * batch_size
-        end_idx = min((i + 1) * batch_size, len(df))
-        batch_df = df[start_idx:end_idx]
-
-        print(f"\nBatch {i + 1}/{num_batches}")
+    # Process the DataFrame in batches, all in the same collector process
+    with CollectorProcess(render_javascript=render_javascript) as collector:
+        for i, batch_df in enumerate(df.iter_slices(n_rows=batch_size)):
+            print(f"\nBatch {i + 1}/{num_batches}")
 
-        # Call the collector_main function on the current batch
-        header_tags_df = collector_main(batch_df, render_javascript=render_javascript)
+            header_tags_df = collector.collect(batch_df)
+            batch_dfs.append(header_tags_df)
 
-        # Check if it's the first batch, then directly set result_df
-        # if not then append latest batch on bottom
-        if i == 0:
-            cumulative_df = header_tags_df
-        else:
-            cumulative_df = pl.concat([cumulative_df, header_tags_df], how="vertical")
+    # Rechunk into a single contiguous DataFrame for the join with the original data
+    cumulative_df = pl.concat(batch_dfs, how="vertical", rechunk=True) if batch_dfs else pl.DataFrame()
 
     return cumulative_df
 
@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+from html_tag_collector.ParsedHTMLCache import ParsedHTMLCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    # Setup: Create a cache instance in a temporary directory
+    cache = ParsedHTMLCache(cache_file=os.path.join(tmp_path, 'parsed_html_cache'))
+    yield cache
+    # Teardown: Close the cache file
+    cache.close_cache()
+
+
+def test_get_not_in_cache(cache):
+    """Test retrieving tags for HTML that has not been parsed."""
+    assert cache.get('<html></html>') is None, "Unparsed HTML should not be in the cache"
+
+
+def test_set_and_get(cache):
+    """Test that tags are retrieved for the same HTML they were stored for."""
+    cache.set('<html><title>Example Domain</title></html>', {'html_title': 'Example Domain'})
+    assert cache.get('<html><title>Example Domain</title></html>') == {'html_title': 'Example Domain'}
+    assert cache.get('<html><title>Other Domain</title></html>') is None
+
+
+def test_cache_persistence(cache):
+    """Test that stored tags are still available after the cache file is reopened."""
+    cache.set('<html></html>', {'html_title': ''})
+    cache.close_cache()
+
+    reopened_cache = ParsedHTMLCache(cache_file=cache.cache_file)
+    assert reopened_cache.get('<html></html>') == {'html_title': ''}
+    reopened_cache.close_cache()
+
+
+def test_cache_cleared_for_new_version(cache):
+    """Test that stored tags are discarded when the cache is reopened with a different parser version."""
+    cache.set('<html></html>', {'html_title': ''})
+    cache.close_cache()
+
+    new_version_cache = ParsedHTMLCache(cache_file=cache.cache_file, version=cache.version + 1)
+    assert new_version_cache.get('<html></html>') is None
+    new_version_cache.set('<html></html>', {'html_title': 'New'})
+    new_version_cache.close_cache()
+
+    reopened_cache = ParsedHTMLCache(cache_file=cache.cache_file, version=cache.version + 1)
+    assert reopened_cache.get('<html></html>') == {'html_title': 'New'}
+    reopened_cache.close_cache()
@@ -1,7 +1,9 @@
+import asyncio
 import json
 import tempfile
 import os
 import pytest
+import requests
 from unittest.mock import mock_open, patch
 from html_tag_collector.RootURLCache import RootURLCache  # Adjust import according to your package structure
 
@@ -68,6 +70,38 @@ def test_get_title_in_cache(cache):
     assert title == 'Example Domain', "Title should be retrieved from the cache"
 
 
+@pytest.mark.parametrize("url,expected_root_url", [
+    ('https://example.com/page?query=1', 'https://example.com'),
+    ('example.com/page', 'https://example.com'),
+    ('http://user@example.com:8080#fragment', 'http://user@example.com:8080'),
+])
+def test_get_root_url(url, expected_root_url, cache):
+    """Test that the root url matches the scheme and host of the url."""
+    assert cache.get_root_url(url) == expected_root_url
+
+
+def test_prefetch(mocker, cache):
+    """Test prefetching a title into the cache, requesting each root url only once."""
+    mock_response = mocker.Mock()
+    mock_response.text = '<html><head><title>Example Domain</title></head></html>'
+    mock_get = mocker.patch('requests.get', return_value=mock_response)
+    asyncio.run(cache.prefetch('https://example.com/page'))
+    asyncio.run(cache.prefetch('https://example.com/other-page'))
+    assert cache.cache == {'https://example.com': 'Example Domain'}, "Title should be stored for the root url"
+    assert mock_get.call_count == 1, "Root url should only be requested once"
+
+
+def test_prefetch_failed_root_url(mocker, cache):
+    """Test that a root url which could not be retrieved is not requested again."""
+    mock_get = mocker.patch('requests.get', side_effect=requests.exceptions.ConnectionError)
+    asyncio.run(cache.prefetch('https://example.com/page'))
+    asyncio.run(cache.prefetch('https://example.com/other-page'))
+    title = cache.get_title('https://example.com/page')
+    assert title == '', "Title should be empty for a root url that could not be retrieved"
+    assert cache.cache == {}, "Failed root urls should not be stored in the cache file"
+    assert mock_get.call_count == 1, "Failed root url should only be requested once"
+
+
 @pytest.mark.parametrize("url,expected_title", [
     ('http://www.example.com', 'Example Domain'),
     ('http://www.google.com', 'Google'),